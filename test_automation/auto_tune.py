@@ -11,6 +11,10 @@ Usage:
 """
 
 import argparse
+import os
+import threading
+from functools import lru_cache
+from math import gcd
 import numpy as np
 import soundfile as sf
 from pathlib import Path
@@ -54,48 +58,36 @@ class AudioMetrics:
         )
         return si_sdr
 
-    @staticmethod
-    def calculate_pesq(reference: np.ndarray, degraded: np.ndarray, sr: int) -> float:
-        """PESQ - Perceptual Evaluation of Speech Quality (1.0-4.5, higher is better)"""
-        # PESQ requires 8kHz or 16kHz
-        if sr not in [8000, 16000]:
-            # Resample to 16kHz
-            reference_resampled = librosa.resample(reference, orig_sr=sr, target_sr=16000)
-            degraded_resampled = librosa.resample(degraded, orig_sr=sr, target_sr=16000)
-            sr = 16000
-        else:
-            reference_resampled = reference
-            degraded_resampled = degraded
-
-        return pesq(sr, reference_resampled, degraded_resampled, 'wb')
-
     @staticmethod
     def calculate_stoi(reference: np.ndarray, degraded: np.ndarray, sr: int) -> float:
         """STOI - Short-Time Objective Intelligibility (0-1, higher is better)"""
         return stoi(reference, degraded, sr, extended=False)
 
-    @staticmethod
-    def calculate_spectral_convergence(reference: np.ndarray, estimate: np.ndarray) -> float:
-        """Spectral convergence (lower is better, in dB)"""
-        # Calculate spectrograms
-        f_ref, t_ref, Sxx_ref = signal.spectrogram(reference, nperseg=512)
-        f_est, t_est, Sxx_est = signal.spectrogram(estimate, nperseg=512)
-
-        # Ensure same shape
-        min_t = min(Sxx_ref.shape[1], Sxx_est.shape[1])
-        Sxx_ref = Sxx_ref[:, :min_t]
-        Sxx_est = Sxx_est[:, :min_t]
-
-        # Calculate convergence
-        numerator = np.sum((Sxx_ref - Sxx_est) ** 2)
-        denominator = np.sum(Sxx_ref ** 2) + 1e-8
-
-        return 10 * np.log10(numerator / denominator)
-
 
 class VSTOptimizer:
     """Optimize VST parameters using Bayesian optimization"""
 
+    # Parameter mapping (exact names from VST inspection)
+    PARAM_MAPPING = {
+        'noise_reduction': 'noise_reduction',
+        'noise_mode': 'use_dtln',  # Boolean: False=Normal (DSP), True=Aggressive (DTLN)
+        'reverb_reduction': 'de_verb_room',
+        'proximity': 'proximity_closeness',
+        'clarity': 'clarity',
+        'de_esser': 'de_esser',
+        'leveler': 'leveler_auto_volume',
+        'breath_control': 'breath_control',
+    }
+
+    # Search-space order used for the memoization key
+    PARAM_NAMES = (
+        'noise_reduction', 'noise_mode', 'reverb_reduction', 'proximity',
+        'clarity', 'de_esser', 'leveler', 'breath_control',
+    )
+
+    # Quantization step shared by the search space and the cache key
+    PARAM_STEP = 0.05
+
     def __init__(
         self,
         vst_path: str,
@@ -116,84 +108,116 @@ class VSTOptimizer:
         self.best_params = None
         self.trial_count = 0
 
-    def process_audio(self, params: Dict[str, float]) -> np.ndarray:
-        """Process audio through VST with given parameters"""
-        # Load VST
+        # The cached plugin instance is stateful, so concurrent trials must
+        # serialize around it; best-result bookkeeping gets its own lock so
+        # metric computation can still overlap.
+        self._vst_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+
+        # Memoize evaluations: TPE revisits quantized parameter points, and
+        # a repeat point can skip the VST pass and all five metrics
+        self._eval_cached = lru_cache(maxsize=4096)(self._evaluate)
+
+        # Load the VST once - re-loading per trial re-parses the plugin
+        # binary and re-allocates DSP state (hundreds of ms per trial)
         try:
-            vst = load_plugin(self.vst_path)
+            self._vst = load_plugin(vst_path)
         except Exception as e:
             print(f"❌ Failed to load VST: {e}")
             raise
 
-        # Debug info on first trial
-        if self.trial_count == 1:
-            print(f"\n🔧 VST loaded successfully")
-            print(f"   Input audio shape: {self.noisy_audio.shape}")
-            print(f"   Sample rate: {self.sample_rate}")
-
         # CRITICAL: Disable Easy Mode so advanced parameters work!
-        vst.easy_mode = False
-
-        # Set parameters (exact names from VST inspection)
-        param_mapping = {
-            'noise_reduction': 'noise_reduction',
-            'noise_mode': 'use_dtln',  # Boolean: False=Normal (DSP), True=Aggressive (DTLN)
-            'reverb_reduction': 'de_verb_room',
-            'proximity': 'proximity_closeness',
-            'clarity': 'clarity',
-            'de_esser': 'de_esser',
-            'leveler': 'leveler_auto_volume',
-            'breath_control': 'breath_control',
-        }
+        self._vst.easy_mode = False
+        self._board = Pedalboard([self._vst])
 
-        for param_key, param_value in params.items():
-            if param_key in param_mapping:
-                vst_param_name = param_mapping[param_key]
-                # Special handling for boolean parameters
-                if param_key == 'noise_mode':
-                    # Convert 0/1 to boolean for use_dtln
-                    value_to_set = bool(param_value > 0.5)
-                else:
-                    value_to_set = param_value
-
-                # Set parameter
-                try:
-                    setattr(vst, vst_param_name, value_to_set)
-                    if self.trial_count == 1:
-                        print(f"   Set {vst_param_name} = {value_to_set}")
-                except AttributeError:
-                    if self.trial_count == 1:
-                        print(f"⚠️  Parameter '{vst_param_name}' not found in VST")
-                except Exception as e:
-                    if self.trial_count == 1:
-                        print(f"⚠️  Failed to set '{vst_param_name}': {e}")
-
-        # Create pedalboard and process
-        board = Pedalboard([vst])
-
-        # Ensure stereo (plugin expects stereo)
-        if len(self.noisy_audio.shape) == 1:
-            audio_stereo = np.stack([self.noisy_audio, self.noisy_audio])
+        # Pre-stack stereo input once (plugin expects (2, N))
+        if len(noisy_audio.shape) == 1:
+            self._audio_stereo = np.stack([noisy_audio, noisy_audio])
         else:
-            audio_stereo = self.noisy_audio.T
+            self._audio_stereo = noisy_audio.T
 
         # Validate input shape
-        if audio_stereo.shape[0] != 2:
-            raise ValueError(f"Expected stereo audio (2, N), got shape {audio_stereo.shape}")
+        if self._audio_stereo.shape[0] != 2:
+            raise ValueError(f"Expected stereo audio (2, N), got shape {self._audio_stereo.shape}")
+
+        # Cache reference-side work that is invariant across trials:
+        # the mono downmix, the 16 kHz copy for PESQ, and the spectrogram
+        # for spectral convergence. Recomputing these per trial wastes an
+        # FFT pass and a polyphase resample on every call.
+        if reference_audio.ndim == 1:
+            self._ref_mono = reference_audio
+        else:
+            self._ref_mono = reference_audio.mean(axis=1)
+        if sample_rate in (8000, 16000):
+            self._ref_16k = self._ref_mono
+            self._resample_up = self._resample_down = 1
+            self._resample_filter = None
+        else:
+            self._ref_16k = librosa.resample(self._ref_mono, orig_sr=sample_rate, target_sr=16000)
+            # Cache the polyphase ratio and anti-aliasing filter for the
+            # per-trial degraded-signal resample; resample_poly redesigns
+            # the filter on every call otherwise. Same Kaiser design
+            # resample_poly uses by default.
+            g = gcd(16000, sample_rate)
+            self._resample_up = 16000 // g
+            self._resample_down = sample_rate // g
+            max_rate = max(self._resample_up, self._resample_down)
+            self._resample_filter = signal.firwin(
+                2 * 10 * max_rate + 1, 1.0 / max_rate, window=('kaiser', 5.0))
+        self._ref_spec = signal.spectrogram(self._ref_mono, nperseg=512)[2]
 
-        # Debug on first trial
+    def process_audio(self, params: Dict[str, float]) -> np.ndarray:
+        """Process audio through VST with given parameters"""
+        vst = self._vst
+
+        # Debug info on first trial
         if self.trial_count == 1:
-            print(f"   Audio prepared for VST: {audio_stereo.shape}")
+            print(f"\n🔧 VST loaded successfully")
+            print(f"   Input audio shape: {self.noisy_audio.shape}")
+            print(f"   Sample rate: {self.sample_rate}")
 
-        # Process with explicit buffer size
-        # Some VSTs need proper buffer sizing
-        try:
-            processed = board.process(audio_stereo, self.sample_rate, buffer_size=512)
-        except Exception as e:
+        # Reuse the cached pedalboard and pre-stacked stereo input
+        board = self._board
+        audio_stereo = self._audio_stereo
+
+        # Parameter mutation and processing share one plugin instance, so
+        # concurrent trials must not interleave here
+        with self._vst_lock:
+            for param_key, param_value in params.items():
+                if param_key in self.PARAM_MAPPING:
+                    vst_param_name = self.PARAM_MAPPING[param_key]
+                    # Special handling for boolean parameters
+                    if param_key == 'noise_mode':
+                        # Convert 0/1 to boolean for use_dtln
+                        value_to_set = bool(param_value > 0.5)
+                    else:
+                        value_to_set = param_value
+
+                    # Set parameter
+                    try:
+                        setattr(vst, vst_param_name, value_to_set)
+                        if self.trial_count == 1:
+                            print(f"   Set {vst_param_name} = {value_to_set}")
+                    except AttributeError:
+                        if self.trial_count == 1:
+                            print(f"⚠️  Parameter '{vst_param_name}' not found in VST")
+                    except Exception as e:
+                        if self.trial_count == 1:
+                            print(f"⚠️  Failed to set '{vst_param_name}': {e}")
+
+            # Debug on first trial
             if self.trial_count == 1:
-                print(f"⚠️  Error with buffer_size parameter: {e}, trying direct call...")
-            # Fallback to direct call
-            processed = board(audio_stereo, self.sample_rate)
+                print(f"   Audio prepared for VST: {audio_stereo.shape}")
+
+            # Process with explicit buffer size
+            # Some VSTs need proper buffer sizing
+            try:
+                processed = board.process(audio_stereo, self.sample_rate, buffer_size=512)
+            except Exception as e:
+                if self.trial_count == 1:
+                    print(f"⚠️  Error with buffer_size parameter: {e}, trying direct call...")
+                # Fallback to direct call
+                processed = board(audio_stereo, self.sample_rate)
 
         # Debug on first trial
         if self.trial_count == 1:
@@ -219,6 +243,36 @@ class VSTOptimizer:
 
         return processed
 
+    def calculate_pesq(self, degraded: np.ndarray) -> float:
+        """PESQ against the cached 16 kHz reference (1.0-4.5, higher is better)"""
+        # PESQ requires 8kHz or 16kHz
+        if self.sample_rate in (8000, 16000):
+            sr = self.sample_rate
+            degraded_resampled = degraded
+        else:
+            sr = 16000
+            degraded_resampled = signal.resample_poly(
+                degraded, self._resample_up, self._resample_down,
+                window=self._resample_filter)
+
+        min_len = min(len(self._ref_16k), len(degraded_resampled))
+        return pesq(sr, self._ref_16k[:min_len], degraded_resampled[:min_len], 'wb')
+
+    def calculate_spectral_convergence(self, estimate: np.ndarray) -> float:
+        """Spectral convergence against the cached reference spectrogram (lower is better, in dB)"""
+        Sxx_est = signal.spectrogram(estimate, nperseg=512)[2]
+
+        # Ensure same shape
+        min_t = min(self._ref_spec.shape[1], Sxx_est.shape[1])
+        Sxx_ref = self._ref_spec[:, :min_t]
+        Sxx_est = Sxx_est[:, :min_t]
+
+        # Calculate convergence
+        numerator = np.sum((Sxx_ref - Sxx_est) ** 2)
+        denominator = np.sum(Sxx_ref ** 2) + 1e-8
+
+        return 10 * np.log10(numerator / denominator)
+
     def calculate_composite_score(
         self,
         processed: np.ndarray,
@@ -239,10 +293,10 @@ class VSTOptimizer:
         # Calculate individual metrics
         metrics_dict = {
             'si_sdr': self.metrics.calculate_si_sdr(reference, processed),
-            'pesq': self.metrics.calculate_pesq(reference, processed, self.sample_rate),
+            'pesq': self.calculate_pesq(processed),
             'stoi': self.metrics.calculate_stoi(reference, processed, self.sample_rate),
             'snr': self.metrics.calculate_snr(reference, processed),
-            'spectral_conv': -self.metrics.calculate_spectral_convergence(reference, processed),  # Negate (lower is better)
+            'spectral_conv': -self.calculate_spectral_convergence(processed),  # Negate (lower is better)
         }
 
         # Weighted composite score
@@ -281,7 +335,8 @@ class VSTOptimizer:
 
     def objective(self, trial: optuna.Trial) -> float:
         """Objective function for Optuna optimization"""
-        self.trial_count += 1
+        with self._state_lock:
+            self.trial_count += 1
 
         # Define parameter search space
         # Using 5% steps (0.05) for realistic precision
@@ -297,26 +352,14 @@ class VSTOptimizer:
         }
 
         try:
-            # Process audio
-            processed = self.process_audio(params)
+            # Quantize to the search-space grid so equivalent points share
+            # one cache entry
+            key = tuple(round(round(params[name] / self.PARAM_STEP) * self.PARAM_STEP, 2)
+                        for name in self.PARAM_NAMES)
 
-            # Calculate score
-            score, metrics = self.calculate_composite_score(processed, self.reference_audio)
-
-            # Save if best so far
-            if score > self.best_score:
-                self.best_score = score
-                self.best_params = params.copy()
-
-                # Save best audio
-                output_path = self.output_dir / f"best_trial_{self.trial_count}_score_{score:.4f}.wav"
-                sf.write(output_path, processed, self.sample_rate)
-
-                print(f"\n🎯 New best! Trial {self.trial_count}, Score: {score:.4f}")
-                print(f"   Metrics: SI-SDR={metrics['si_sdr']:.2f}, PESQ={metrics['pesq']:.2f}, "
-                      f"STOI={metrics['stoi']:.3f}, SNR={metrics['snr']:.2f}dB")
-                print(f"   Params: {params}")
-                print(f"   Saved to: {output_path}")
+            hits_before = self._eval_cached.cache_info().hits
+            score = self._eval_cached(key)
+            trial.set_user_attr('cache_hit', self._eval_cached.cache_info().hits > hits_before)
 
             return score
 
@@ -324,9 +367,45 @@ class VSTOptimizer:
             print(f"Error in trial {self.trial_count}: {e}")
             return -np.inf
 
-    def optimize(self, n_trials: int = 100) -> Dict[str, float]:
+    def _evaluate(self, key: Tuple[float, ...]) -> float:
+        """Process and score one quantized parameter point (memoized)"""
+        params = dict(zip(self.PARAM_NAMES, key))
+
+        # Process audio
+        processed = self.process_audio(params)
+
+        # Calculate score
+        score, metrics = self.calculate_composite_score(processed, self.reference_audio)
+
+        # Save if best so far
+        with self._state_lock:
+            is_best = score > self.best_score
+            if is_best:
+                self.best_score = score
+                self.best_params = params.copy()
+
+        if is_best:
+            # Save best audio
+            output_path = self.output_dir / f"best_trial_{self.trial_count}_score_{score:.4f}.wav"
+            sf.write(output_path, processed, self.sample_rate)
+
+            print(f"\n🎯 New best! Trial {self.trial_count}, Score: {score:.4f}")
+            print(f"   Metrics: SI-SDR={metrics['si_sdr']:.2f}, PESQ={metrics['pesq']:.2f}, "
+                  f"STOI={metrics['stoi']:.3f}, SNR={metrics['snr']:.2f}dB")
+            print(f"   Params: {params}")
+            print(f"   Saved to: {output_path}")
+
+        return score
+
+    def optimize(self, n_trials: int = 100, n_jobs: int = None) -> Dict[str, float]:
         """Run optimization"""
-        print(f"Starting optimization with {n_trials} trials...")
+        if n_jobs is None:
+            # Pedalboard and numpy release the GIL, so the metric passes of
+            # concurrent trials overlap even though processing serializes
+            # on the plugin lock
+            n_jobs = max(1, (os.cpu_count() or 1) // 2)
+
+        print(f"Starting optimization with {n_trials} trials ({n_jobs} parallel jobs)...")
         print(f"VST: {self.vst_path}")
         print(f"Sample rate: {self.sample_rate} Hz")
         print(f"Audio length: {len(self.noisy_audio) / self.sample_rate:.2f} seconds")
@@ -338,7 +417,7 @@ class VSTOptimizer:
         )
 
         # Run optimization
-        study.optimize(self.objective, n_trials=n_trials)
+        study.optimize(self.objective, n_trials=n_trials, n_jobs=n_jobs)
 
         print(f"\n✅ Optimization complete!")
 
@@ -376,6 +455,7 @@ def main():
     parser.add_argument('--reference', required=True, help='Path to professionally cleaned reference audio')
     parser.add_argument('--vst', required=True, help='Path to VST3 plugin')
     parser.add_argument('--trials', type=int, default=100, help='Number of optimization trials')
+    parser.add_argument('--jobs', type=int, default=None, help='Parallel trial workers (default: half the CPU cores)')
     parser.add_argument('--output', default='optimization_results', help='Output directory')
 
     args = parser.parse_args()
@@ -408,7 +488,7 @@ def main():
     )
 
     # Run optimization
-    best_params = optimizer.optimize(n_trials=args.trials)
+    best_params = optimizer.optimize(n_trials=args.trials, n_jobs=args.jobs)
 
     # Save best parameters as JSON if successful
     if best_params is not None:
@@ -9,57 +9,109 @@ Usage:
 
 import argparse
 import json
+import os
 import soundfile as sf
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from pedalboard import Pedalboard, load_plugin
 from tqdm import tqdm
 
 
-def process_file(vst_path: str, audio_path: Path, params: dict, output_path: Path):
-    """Process a single audio file"""
-    # Load VST
-    vst = load_plugin(vst_path)
-
-    # Set parameters
-    param_mapping = {
-        'noise_reduction': 'Noise Reduction',
-        'noise_mode': 'Noise Mode',
-        'reverb_reduction': 'De-Verb',
-        'proximity': 'Proximity',
-        'clarity': 'Clarity',
-        'de_esser': 'De-Esser',
-        'leveler': 'Leveler',
-        'breath_control': 'Breath Control',
-    }
-
-    for param_key, param_value in params.items():
-        if param_key in param_mapping:
-            vst_param_name = param_mapping[param_key]
-            try:
-                setattr(vst, vst_param_name, param_value)
-            except AttributeError:
-                print(f"Warning: Parameter '{vst_param_name}' not found")
-
-    # Load audio
-    audio, sr = sf.read(audio_path)
-
-    # Ensure stereo
-    if len(audio.shape) == 1:
-        audio_stereo = np.stack([audio, audio])
-    else:
-        audio_stereo = audio.T
-
-    # Process
-    board = Pedalboard([vst])
-    processed = board(audio_stereo, sr)
-
-    # Convert back to original format
-    if len(audio.shape) == 1:
-        processed = np.mean(processed, axis=0)
-
-    # Save
-    sf.write(output_path, processed, sr)
+# Parameter mapping (exact names from VST inspection)
+PARAM_MAPPING = {
+    'noise_reduction': 'Noise Reduction',
+    'noise_mode': 'Noise Mode',
+    'reverb_reduction': 'De-Verb',
+    'proximity': 'Proximity',
+    'clarity': 'Clarity',
+    'de_esser': 'De-Esser',
+    'leveler': 'Leveler',
+    'breath_control': 'Breath Control',
+}
+
+
+def build_setters(vst, params: dict) -> dict:
+    """Pre-resolve a setter per mapped parameter the plugin actually has.
+
+    Resolving with hasattr once up front keeps the AttributeError
+    try/except out of the assignment loop.
+    """
+    setters = {}
+    for param_key in params:
+        if param_key not in PARAM_MAPPING:
+            continue
+        vst_param_name = PARAM_MAPPING[param_key]
+        if hasattr(vst, vst_param_name):
+            setters[param_key] = lambda value, name=vst_param_name: setattr(vst, name, value)
+        else:
+            print(f"Warning: Parameter '{vst_param_name}' not found")
+    return setters
+
+
+def apply_params(vst, params: dict):
+    """Apply optimized parameters to a loaded plugin"""
+    for param_key, setter in build_setters(vst, params).items():
+        setter(params[param_key])
+
+
+# Per-worker plugin state: plugin objects aren't picklable, so each pool
+# worker loads its own instance once and reuses it for its share of files
+_worker_vst = None
+_worker_board = None
+
+
+def _init_worker(vst_path: str, params: dict):
+    global _worker_vst, _worker_board
+    _worker_vst = load_plugin(vst_path)
+    apply_params(_worker_vst, params)
+    _worker_board = Pedalboard([_worker_vst])
+
+
+def _process_one(paths):
+    """Process one (input, output) pair in a pool worker"""
+    audio_file, output_file = paths
+    try:
+        process_file(_worker_vst, _worker_board, audio_file, output_file)
+        return audio_file.name, None
+    except Exception as e:
+        return audio_file.name, str(e)
+
+
+def process_file(vst, board: Pedalboard, audio_path: Path, output_path: Path,
+                 blocksize: int = 131072):
+    """Stream a single audio file through an already-loaded plugin"""
+    # The board outlives this call (one per worker), so clear noise
+    # estimators, leveler ballistics, and filter tails left over from the
+    # previous file; blocks within the file still stream with reset=False
+    board.reset()
+
+    # Block-based I/O keeps memory flat regardless of file length instead
+    # of materializing the whole file up front
+    # Matching the source subtype skips format inference and any implicit
+    # sample-width conversion on write
+    with sf.SoundFile(audio_path) as fin, \
+         sf.SoundFile(output_path, 'w', samplerate=fin.samplerate,
+                      channels=fin.channels, format=fin.format,
+                      subtype=fin.subtype) as fout:
+        mono = fin.channels == 1
+
+        for block in fin.blocks(blocksize=blocksize, dtype='float32', always_2d=True):
+            chunk = block.T
+
+            # Ensure stereo - broadcast view duplicates the channel without
+            # copying; Pedalboard copies internally only if it has to
+            if mono:
+                chunk = np.broadcast_to(chunk[0], (2, chunk[0].size))
+
+            # reset=False preserves plugin state across block boundaries
+            processed = board.process(chunk, fin.samplerate, reset=False)
+
+            # Convert back to original format
+            if mono:
+                processed = np.mean(processed, axis=0, keepdims=True)
+
+            fout.write(processed.T)
 
 
 def main():
@@ -78,12 +130,22 @@ def main():
 
     print(f"Loaded parameters: {params}\n")
 
-    # Get input files
+    # Get input files - for plain '*.ext' patterns, scandir reuses the
+    # dirent type info instead of stat-ing every entry the way Path.glob
+    # does, which matters on directories with thousands of files. Other
+    # glob patterns (e.g. 'ep01*.wav', '[ab]*.wav') keep the glob path.
     input_path = Path(args.input)
     if input_path.is_file():
         audio_files = [input_path]
     else:
-        audio_files = list(input_path.glob(args.pattern))
+        suffix = args.pattern.lstrip('*').lower()
+        if any(ch in suffix for ch in '*?['):
+            audio_files = sorted(input_path.glob(args.pattern))
+        else:
+            audio_files = sorted(
+                Path(entry.path) for entry in os.scandir(input_path)
+                if entry.is_file() and entry.name.lower().endswith(suffix)
+            )
 
     if not audio_files:
         print(f"No audio files found matching pattern: {args.pattern}")
@@ -93,16 +155,21 @@ def main():
     output_dir = Path(args.output)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    print(f"Processing {len(audio_files)} files...")
+    # Files are independent, so fan out across cores; each worker loads
+    # the plugin once in its initializer and amortizes it over its batch
+    jobs = [(audio_file, output_dir / audio_file.name) for audio_file in audio_files]
+    workers = min(len(jobs), os.cpu_count() or 1)
+
+    print(f"Processing {len(audio_files)} files ({workers} workers)...")
     print(f"Output directory: {output_dir}\n")
 
-    # Process files
-    for audio_file in tqdm(audio_files, desc="Processing"):
-        try:
-            output_file = output_dir / audio_file.name
-            process_file(args.vst, audio_file, params, output_file)
-        except Exception as e:
-            print(f"\nError processing {audio_file.name}: {e}")
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_worker,
+                             initargs=(args.vst, params)) as ex:
+        for name, error in tqdm(ex.map(_process_one, jobs),
+                                total=len(jobs), desc="Processing"):
+            if error:
+                print(f"\nError processing {name}: {error}")
 
     print(f"\n✅ Done! Processed files saved to: {output_dir}")
 
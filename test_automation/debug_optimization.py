@@ -7,27 +7,33 @@ import soundfile as sf
 from pedalboard import Pedalboard, load_plugin
 from pathlib import Path
 
+def _ms(x):
+    """Mean square via a fused BLAS reduction (no squared temporary)"""
+    flat = x.ravel()
+    return np.dot(flat, flat) / flat.size
+
+
 def test_audio_files(noisy_path, clean_path):
     """Check if audio files are actually different"""
     print("=" * 60)
     print("1. Testing Audio File Differences")
     print("=" * 60)
 
-    noisy, sr_noisy = sf.read(noisy_path)
-    clean, sr_clean = sf.read(clean_path)
+    noisy, sr_noisy = sf.read(noisy_path, dtype='float32')
+    clean, sr_clean = sf.read(clean_path, dtype='float32')
 
     print(f"\nNoisy audio:")
     print(f"  Shape: {noisy.shape}")
     print(f"  Sample rate: {sr_noisy} Hz")
     print(f"  Duration: {len(noisy) / sr_noisy:.2f} seconds")
-    print(f"  RMS: {np.sqrt(np.mean(noisy**2)):.6f}")
+    print(f"  RMS: {np.sqrt(_ms(noisy)):.6f}")
     print(f"  Peak: {np.abs(noisy).max():.6f}")
 
     print(f"\nClean (reference) audio:")
     print(f"  Shape: {clean.shape}")
     print(f"  Sample rate: {sr_clean} Hz")
     print(f"  Duration: {len(clean) / sr_clean:.2f} seconds")
-    print(f"  RMS: {np.sqrt(np.mean(clean**2)):.6f}")
+    print(f"  RMS: {np.sqrt(_ms(clean)):.6f}")
     print(f"  Peak: {np.abs(clean).max():.6f}")
 
     # Check if they're different
@@ -55,19 +61,23 @@ def test_vst_processing(vst_path, audio_path):
     print("2. Testing VST Processing With Different Settings")
     print("=" * 60)
 
-    audio, sr = sf.read(audio_path)
+    audio, sr = sf.read(audio_path, dtype='float32')
     vst = load_plugin(vst_path)
 
     # CRITICAL: Disable Easy Mode!
     vst.easy_mode = False
     print("  Disabled Easy Mode - using advanced parameters")
 
-    # Prepare stereo
+    # Prepare stereo (zero-copy broadcast view for mono input)
     if len(audio.shape) == 1:
-        audio_stereo = np.stack([audio, audio])
+        audio_stereo = np.broadcast_to(audio, (2, audio.size))
     else:
         audio_stereo = audio.T
 
+    # One board for all three tests: parameter changes are picked up by
+    # process() without re-preparing the plugin graph each time
+    board = Pedalboard([vst])
+
     # Test 1: All parameters OFF (0.0)
     print("\n📊 Test 1: All parameters at 0.0 (OFF)")
     vst.noise_reduction = 0.0
@@ -77,10 +87,9 @@ def test_vst_processing(vst_path, audio_path):
     vst.de_esser = 0.0
     vst.leveler_auto_volume = 0.0
 
-    board = Pedalboard([vst])
     output_off = board(audio_stereo, sr)
 
-    rms_off = np.sqrt(np.mean(output_off**2))
+    rms_off = np.sqrt(_ms(output_off))
     print(f"  Output RMS: {rms_off:.6f}")
 
     # Test 2: All parameters MAX (1.0)
@@ -92,10 +101,9 @@ def test_vst_processing(vst_path, audio_path):
     vst.de_esser = 0.7
     vst.leveler_auto_volume = 0.8
 
-    board = Pedalboard([vst])
     output_max = board(audio_stereo, sr)
 
-    rms_max = np.sqrt(np.mean(output_max**2))
+    rms_max = np.sqrt(_ms(output_max))
     print(f"  Output RMS: {rms_max:.6f}")
 
     # Test 3: Medium settings
@@ -107,17 +115,24 @@ def test_vst_processing(vst_path, audio_path):
     vst.de_esser = 0.35
     vst.leveler_auto_volume = 0.4
 
-    board = Pedalboard([vst])
     output_med = board(audio_stereo, sr)
 
-    rms_med = np.sqrt(np.mean(output_med**2))
+    rms_med = np.sqrt(_ms(output_med))
     print(f"  Output RMS: {rms_med:.6f}")
 
-    # Compare
+    # Compare - one reused scratch buffer for all three diffs instead of
+    # allocating subtraction and abs temporaries per comparison
     print("\n📈 Comparison:")
-    diff_off_max = np.abs(output_off - output_max).mean()
-    diff_off_med = np.abs(output_off - output_med).mean()
-    diff_med_max = np.abs(output_med - output_max).mean()
+    scratch = np.empty_like(output_off)
+
+    def mean_abs_diff(a, b):
+        np.subtract(a, b, out=scratch)
+        np.abs(scratch, out=scratch)
+        return scratch.mean()
+
+    diff_off_max = mean_abs_diff(output_off, output_max)
+    diff_off_med = mean_abs_diff(output_off, output_med)
+    diff_med_max = mean_abs_diff(output_med, output_max)
 
     print(f"  OFF vs MAX difference:    {diff_off_max:.6f}")
     print(f"  OFF vs MEDIUM difference: {diff_off_med:.6f}")
@@ -146,19 +161,26 @@ def test_metric_calculation():
     # Reference: clean sine wave
     reference = 0.5 * np.sin(2 * np.pi * 440 * t)
 
+    # Seeded PCG64 generator filling one reused buffer: faster than the
+    # legacy randn and makes this debug test deterministic
+    rng = np.random.default_rng(0)
+    noise_buf = np.empty_like(reference)
+
     # Test 1: Identical signal (should score high)
     identical = reference.copy()
 
     # Test 2: Noisy signal (should score low)
-    noisy = reference + 0.1 * np.random.randn(len(reference))
+    rng.standard_normal(out=noise_buf)
+    noisy = reference + 0.1 * noise_buf
 
     # Test 3: Heavily distorted (should score very low)
-    distorted = reference + 0.5 * np.random.randn(len(reference))
+    rng.standard_normal(out=noise_buf)
+    distorted = reference + 0.5 * noise_buf
 
     print("\nCalculating SNR for test signals:")
-    snr_identical = 10 * np.log10(np.mean(reference**2) / (np.mean((identical - reference)**2) + 1e-10))
-    snr_noisy = 10 * np.log10(np.mean(reference**2) / (np.mean((noisy - reference)**2) + 1e-10))
-    snr_distorted = 10 * np.log10(np.mean(reference**2) / (np.mean((distorted - reference)**2) + 1e-10))
+    snr_identical = 10 * np.log10(_ms(reference) / (_ms(identical - reference) + 1e-10))
+    snr_noisy = 10 * np.log10(_ms(reference) / (_ms(noisy - reference) + 1e-10))
+    snr_distorted = 10 * np.log10(_ms(reference) / (_ms(distorted - reference) + 1e-10))
 
     print(f"  Identical:  SNR = {snr_identical:.2f} dB (should be very high)")
     print(f"  Noisy:      SNR = {snr_noisy:.2f} dB (should be moderate)")
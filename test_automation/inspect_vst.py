@@ -16,46 +16,18 @@ def inspect_vst(vst_path):
     print(f"\nPlugin: {vst.name if hasattr(vst, 'name') else 'Unknown'}")
     print(f"Type: {type(vst)}")
 
-    print(f"\nAll attributes and parameters:")
+    print(f"\nPlugin parameters:")
     print("-" * 60)
 
-    # Get all non-private attributes
-    attrs = [attr for attr in dir(vst) if not attr.startswith('_')]
+    # Pedalboard exposes the host parameter map directly; walking it is
+    # far cheaper than dir() + getattr over every attribute, and it only
+    # contains real automatable parameters
+    parameters = sorted(vst.parameters.items())
 
-    # Separate into categories
-    parameters = []
-    methods = []
-    properties = []
-
-    for attr in attrs:
-        try:
-            val = getattr(vst, attr)
-            if callable(val):
-                methods.append(attr)
-            elif isinstance(val, (int, float)):
-                parameters.append((attr, val))
-            else:
-                properties.append((attr, val))
-        except:
-            pass
-
-    # Print parameters (these are what we can set)
     print(f"\n📊 Parameters ({len(parameters)}):")
     print("   (These are what you can modify)")
-    for name, value in sorted(parameters):
-        print(f"   {name:30s} = {value}")
-
-    # Print properties
-    print(f"\n📋 Properties ({len(properties)}):")
-    for name, value in sorted(properties):
-        val_str = str(value)[:50] if len(str(value)) <= 50 else str(value)[:47] + "..."
-        print(f"   {name:30s} = {val_str}")
-
-    # Print methods
-    print(f"\n🔧 Methods ({len(methods)}):")
-    print(f"   {', '.join(sorted(methods)[:10])}")
-    if len(methods) > 10:
-        print(f"   ... and {len(methods) - 10} more")
+    for name, param in parameters:
+        print(f"   {name:30s} = {param.raw_value}  ({param.label})")
 
     print("\n" + "=" * 60)
     print("For auto_tune.py, use the parameter names exactly as shown above")
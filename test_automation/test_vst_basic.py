@@ -24,11 +24,12 @@ def test_vst_loading(vst_path, audio_path):
         print(f"   ❌ Failed to load VST: {e}")
         return False
 
-    # 2. Print available parameters
+    # 2. Print available parameters - the parameters dict is the host's
+    # own map, much cheaper than scanning dir(vst) with getattr
     print(f"\n2. VST Parameters:")
     try:
-        params = [attr for attr in dir(vst) if not attr.startswith('_')]
-        print(f"   Found {len(params)} parameters/methods")
+        params = list(vst.parameters)
+        print(f"   Found {len(params)} parameters")
         # Print first 20
         for p in params[:20]:
             print(f"   - {p}")
@@ -40,7 +41,7 @@ def test_vst_loading(vst_path, audio_path):
     # 3. Load audio
     print(f"\n3. Loading audio from: {audio_path}")
     try:
-        audio, sr = sf.read(audio_path)
+        audio, sr = sf.read(audio_path, dtype='float32')
         print(f"   ✅ Audio loaded")
         print(f"   Shape: {audio.shape}")
         print(f"   Sample rate: {sr} Hz")
@@ -52,7 +53,8 @@ def test_vst_loading(vst_path, audio_path):
     # 4. Prepare stereo audio
     print(f"\n4. Preparing audio for VST")
     if len(audio.shape) == 1:
-        audio_stereo = np.stack([audio, audio])
+        # Zero-copy broadcast view instead of stacking two copies
+        audio_stereo = np.broadcast_to(audio, (2, audio.size))
         print(f"   Converted mono to stereo: {audio_stereo.shape}")
     else:
         audio_stereo = audio.T
@@ -103,9 +105,12 @@ def test_vst_loading(vst_path, audio_path):
         traceback.print_exc()
         return False
 
-    # 7. Verify output is different from input
+    # 7. Verify output is different from input - in-place subtract/abs on
+    # one scratch buffer instead of two full-size temporaries
     print(f"\n7. Verifying VST actually processed audio")
-    diff = np.abs(result_full - audio_stereo).mean()
+    scratch = np.subtract(result_full, audio_stereo)
+    np.abs(scratch, out=scratch)
+    diff = scratch.mean()
     print(f"   Mean absolute difference: {diff:.6f}")
 
     if diff < 1e-8: